@@ -1,9 +1,25 @@
 # backend/app.py
-from flask import Flask
+import os
+import tempfile
+from flask import Flask, Request
 from flask_cors import CORS
 from .routes import api_bp # Import the blueprint
+from .file_parser import MAX_UPLOAD_BYTES, UPLOAD_SPOOL_THRESHOLD
+from .ollama_utils import LLM_PROVIDER, start_model_lifecycle
+
+
+class SpooledUploadRequest(Request):
+    """Keeps small uploads in memory and spools anything above UPLOAD_SPOOL_THRESHOLD to disk."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_THRESHOLD, mode="rb+")
+
 
 app = Flask(__name__)
+app.request_class = SpooledUploadRequest
+
+# Requests larger than this are rejected with 413 from the Content-Length header, before the body is read
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES
 
 # This allows your React app (e.g., from localhost:5173) to make requests to your Flask app (at localhost:5000)
 CORS(app) 
@@ -12,4 +28,12 @@ CORS(app)
 app.register_blueprint(api_bp, url_prefix='/api')
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    debug = os.getenv("FLASK_DEBUG", "1") == "1"
+
+    # When parsing runs on the local Ollama model, load it now instead of on the first upload.
+    # This lives here rather than at import time so importing the app sends no traffic, and
+    # with the debug reloader only the child process that actually serves requests starts it.
+    if LLM_PROVIDER == "ollama" and (not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true"):
+        start_model_lifecycle()
+
+    app.run(debug=debug, port=int(os.getenv("PORT", "5000")))
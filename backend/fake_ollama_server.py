@@ -0,0 +1,195 @@
+# backend/fake_ollama_server.py
+"""
+Stand-in for a local Ollama server, used by the load test.
+
+It answers /api/chat and /api/generate like Ollama does, but instead of running a model it
+sleeps for a time derived from the prompt and output token counts. Requests beyond the
+configured number of parallel slots wait in a queue, the way Ollama serialises requests
+once OLLAMA_NUM_PARALLEL is reached. Like Ollama, each slot keeps the KV cache of the
+last prompt it served: a request whose system message matches its slot's previous one
+is a prompt cache hit, so only the user message counts towards prompt evaluation.
+
+Run standalone with:  python -m backend.fake_ollama_server --port 11435
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Canned answers that satisfy the JSON shapes ollama_utils expects
+PARSED_RESUME = {
+    "personal": {"name": "Jordan Lee", "email": "jordan.lee@example.com", "phone": "555-0100", "location": "Austin, TX"},
+    "summary": "Backend engineer with six years of experience building data-heavy web services.",
+    "experience": [{"jobTitle": "Software Engineer", "company": "Acme Corp", "dates": "2019 - Present", "description": "Built and ran resume ingestion services."}],
+    "education": [{"degree": "B.S. Computer Science", "institution": "State University", "graduationYear": "2018", "gpa": "", "achievements": ""}],
+    "skills": [{"category": "Languages", "skills_list": "Python, SQL, TypeScript"}],
+    "certifications": [],
+    "publications": []
+}
+SUMMARY_VERSIONS = {"versions": ["First version of the summary.", "Second version of the summary.", "Third version of the summary."]}
+PLAIN_TEXT_REPLY = "Experienced engineer who ships reliable services and mentors the team around them."
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English text)."""
+    return max(1, len(text) // 4)
+
+
+class FakeOllamaModel:
+    """Latency model for a single loaded model with a fixed number of parallel slots."""
+
+    def __init__(self, parallel=1, load_ms=2000.0, prompt_token_ms=0.5, output_token_ms=25.0,
+                 json_output_tokens=350, text_output_tokens=120):
+        self.load_ms = load_ms
+        self.prompt_token_ms = prompt_token_ms
+        self.output_token_ms = output_token_ms
+        self.json_output_tokens = json_output_tokens
+        self.text_output_tokens = text_output_tokens
+
+        self._lock = threading.Lock()
+        self._slot_free = threading.Condition(self._lock)
+        # Slots that are not serving a request, and the system prompt held in each slot's KV cache
+        self._free_slots = list(range(parallel))
+        self._slot_prefixes = [None] * parallel
+        self._loaded = False
+        self._queued = 0
+        self.max_queue_depth = 0
+        self.requests_served = 0
+
+    def _enter_queue(self):
+        with self._lock:
+            self._queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self._queued)
+
+    def _leave_queue(self):
+        with self._lock:
+            self._queued -= 1
+
+    def _acquire_slot(self, system_prompt):
+        """Waits for a free slot, preferring one that already holds this system prompt."""
+        with self._slot_free:
+            while not self._free_slots:
+                self._slot_free.wait()
+            slot = next((s for s in self._free_slots if self._slot_prefixes[s] == system_prompt), self._free_slots[0])
+            self._free_slots.remove(slot)
+            prefix_cached = self._slot_prefixes[slot] == system_prompt
+            self._slot_prefixes[slot] = system_prompt
+            return slot, prefix_cached
+
+    def _release_slot(self, slot):
+        with self._slot_free:
+            self._free_slots.append(slot)
+            self._slot_free.notify()
+
+    def reset_stats(self):
+        with self._lock:
+            self.max_queue_depth = self._queued
+            self.requests_served = 0
+
+    def complete(self, messages, is_json, num_predict=None):
+        """Simulates one completion and returns (content, Ollama-style timing fields)."""
+        system_prompt = "".join(m.get("content", "") for m in messages if m.get("role") == "system")
+        user_prompt = "".join(m.get("content", "") for m in messages if m.get("role") != "system")
+
+        self._enter_queue()
+        slot, prefix_cached = self._acquire_slot(system_prompt)
+        self._leave_queue()
+        try:
+            with self._lock:
+                load_ms = 0.0 if self._loaded else self.load_ms
+                self._loaded = True
+
+            prompt_tokens = estimate_tokens(user_prompt)
+            if system_prompt and not prefix_cached:
+                prompt_tokens += estimate_tokens(system_prompt)
+            output_tokens = self.json_output_tokens if is_json else self.text_output_tokens
+            if num_predict is not None and num_predict >= 0:
+                output_tokens = min(output_tokens, num_predict)
+
+            prompt_eval_ms = prompt_tokens * self.prompt_token_ms
+            eval_ms = output_tokens * self.output_token_ms
+            time.sleep((load_ms + prompt_eval_ms + eval_ms) / 1000)
+
+            with self._lock:
+                self.requests_served += 1
+        finally:
+            self._release_slot(slot)
+
+        if not is_json:
+            content = PLAIN_TEXT_REPLY
+        elif '"versions"' in system_prompt:
+            content = json.dumps(SUMMARY_VERSIONS)
+        else:
+            content = json.dumps(PARSED_RESUME)
+
+        timings = {
+            "load_duration": int(load_ms * 1e6),
+            "prompt_eval_count": prompt_tokens,
+            "prompt_eval_duration": int(prompt_eval_ms * 1e6),
+            "eval_count": output_tokens,
+            "eval_duration": int(eval_ms * 1e6),
+            "total_duration": int((load_ms + prompt_eval_ms + eval_ms) * 1e6),
+        }
+        return content, timings
+
+
+def _make_handler(model):
+    class FakeOllamaHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass  # Keep load test output readable
+
+        def _send_json(self, body, status=200):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            is_json = payload.get("format") == "json"
+            num_predict = (payload.get("options") or {}).get("num_predict")
+
+            if self.path == "/api/chat":
+                content, timings = model.complete(payload.get("messages", []), is_json, num_predict)
+                self._send_json({"model": payload.get("model"), "message": {"role": "assistant", "content": content}, "done": True, **timings})
+            elif self.path == "/api/generate":
+                if not payload.get("prompt"):
+                    # Load / keep-alive request: Ollama answers without generating anything
+                    self._send_json({"model": payload.get("model"), "response": "", "done": True})
+                    return
+                content, timings = model.complete([{"role": "user", "content": payload["prompt"]}], is_json, num_predict)
+                self._send_json({"model": payload.get("model"), "response": content, "done": True, **timings})
+            else:
+                self._send_json({"error": f"unknown endpoint {self.path}"}, status=404)
+
+    return FakeOllamaHandler
+
+
+def start_fake_ollama_server(model, host="127.0.0.1", port=0):
+    """Starts the stand-in server on a background thread and returns the server instance."""
+    server = ThreadingHTTPServer((host, port), _make_handler(model))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-ollama", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in Ollama server with a queueing and per-token latency model.")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--parallel", type=int, default=1, help="Requests served at once (like OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--load-ms", type=float, default=2000.0, help="Model load time paid by the first request")
+    parser.add_argument("--prompt-token-ms", type=float, default=0.5)
+    parser.add_argument("--output-token-ms", type=float, default=25.0)
+    args = parser.parse_args()
+
+    model = FakeOllamaModel(parallel=args.parallel, load_ms=args.load_ms,
+                            prompt_token_ms=args.prompt_token_ms, output_token_ms=args.output_token_ms)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), _make_handler(model))
+    print(f"Fake Ollama server listening on http://127.0.0.1:{args.port}")
+    server.serve_forever()
@@ -1,52 +1,140 @@
+import os
+import zipfile
 import docx
 import pypdf
-import io
+from pypdf import PasswordType
+from pypdf.errors import PdfReadError
 from bs4 import BeautifulSoup
 
-# Import our new AI function
-from .gemini_utils import structure_text_with_ai # Corrected relative import
+from .ollama_utils import LLM_PROVIDER
+
+# Import our new AI function (LLM_PROVIDER=ollama switches structuring to the local model)
+if LLM_PROVIDER == "ollama":
+    from .ollama_utils import generate_resume_fields_from_raw_text as structure_text_with_ai
+else:
+    from .gemini_utils import structure_text_with_ai # Corrected relative import
+
+# --- Upload limits (override via environment variables) ---
+# Largest request body Flask will accept; bigger uploads are rejected with 413 before the body is read
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# Uploads larger than this are spooled to a temporary file on disk instead of being kept in memory
+UPLOAD_SPOOL_THRESHOLD = int(os.getenv("UPLOAD_SPOOL_THRESHOLD", str(512 * 1024)))
+# Resumes longer than this are rejected from the PDF page tree before any text is extracted
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "20"))
+# Total uncompressed size allowed for the parts of a .docx archive (guards against zip bombs)
+MAX_DOCX_UNCOMPRESSED_BYTES = int(os.getenv("MAX_DOCX_UNCOMPRESSED_BYTES", str(50 * 1024 * 1024)))
+
+PDF_MAGIC = b"%PDF-"
+DOCX_MAGIC = b"PK\x03\x04"
+DOCX_REQUIRED_PARTS = {"[Content_Types].xml", "word/document.xml"}
+
+
+def detect_file_type(file_storage):
+    """
+    Identifies an upload from its leading magic bytes rather than its filename.
+
+    Only the first few bytes are read; the stream is rewound afterwards.
+
+    Returns:
+        'pdf', 'docx', or None if the file is not a supported type.
+    """
+    stream = file_storage.stream
+    header = stream.read(len(PDF_MAGIC))
+    stream.seek(0)
+
+    if header.startswith(PDF_MAGIC):
+        return 'pdf'
+    if header.startswith(DOCX_MAGIC) and file_storage.filename.lower().endswith('.docx'):
+        return 'docx'
+    return None
+
+
+def _extract_pdf_text(stream):
+    """Extracts text from a PDF stream, rejecting encrypted or oversized documents up front."""
+    pdf_reader = pypdf.PdfReader(stream)
+
+    # Both checks only touch the trailer and the page tree, not the page contents.
+    # PDFs with only an owner password (permission flags) open with the empty user password.
+    if pdf_reader.is_encrypted and pdf_reader.decrypt("") == PasswordType.NOT_DECRYPTED:
+        return None, {"error": "Password-protected PDFs are not supported. Please upload an unprotected file.", "statusCode": 400}
+
+    # Count the pages in the actual page tree; the declared /Count can understate it
+    try:
+        page_count = len(pdf_reader.pages)
+    except KeyError as e:
+        raise PdfReadError(f"Missing page tree entry: {e}") from e
+    if page_count > MAX_PDF_PAGES:
+        return None, {"error": f"The PDF has {page_count} pages; resumes are limited to {MAX_PDF_PAGES} pages.", "statusCode": 413}
+
+    return '\n'.join(page.extract_text() for page in pdf_reader.pages), None
+
+
+def _extract_docx_text(stream):
+    """Extracts paragraph text from a DOCX stream after checking its uncompressed size."""
+    with zipfile.ZipFile(stream) as archive:
+        uncompressed_size = sum(info.file_size for info in archive.infolist())
+        part_names = set(archive.namelist())
+    stream.seek(0)
+
+    # A renamed ZIP passes the magic byte check but is missing the parts every .docx has
+    if not DOCX_REQUIRED_PARTS <= part_names:
+        return None, {"error": "The file is not a valid .docx document.", "statusCode": 400}
+
+    if uncompressed_size > MAX_DOCX_UNCOMPRESSED_BYTES:
+        return None, {"error": "The document is too large to process.", "statusCode": 413}
+
+    doc = docx.Document(stream)
+    return '\n'.join(para.text for para in doc.paragraphs), None
+
 
 def parse_resume_file(file_storage):
     """
     Parses an uploaded file, extracts raw text, and sends it to an AI for structuring.
-    
+
+    The upload stream (in memory or spooled to disk by Flask) is handed to the
+    extractors directly; it is never copied into a separate buffer.
+
     Args:
         file_storage: The FileStorage object from Flask request.files.
 
     Returns:
-        A dictionary containing the AI-parsed data or an error.
+        A dictionary containing the AI-parsed data or an error. Errors caused by the
+        upload itself carry a 'statusCode' key with the HTTP status to respond with.
     """
     filename = file_storage.filename
-    raw_text = ""
 
     try:
         print(f"Starting to parse file: {filename}")
-        if filename.endswith('.docx'):
-            doc = docx.Document(io.BytesIO(file_storage.read()))
-            for para in doc.paragraphs:
-                raw_text += para.text + '\n'
-        
-        elif filename.endswith('.pdf'):
-            pdf_reader = pypdf.PdfReader(io.BytesIO(file_storage.read()))
-            for page in pdf_reader.pages:
-                raw_text += page.extract_text() + '\n'
-        
+        file_type = detect_file_type(file_storage)
+
+        if file_type == 'docx':
+            raw_text, error = _extract_docx_text(file_storage.stream)
+
+        elif file_type == 'pdf':
+            raw_text, error = _extract_pdf_text(file_storage.stream)
+
         else:
-            return {"error": "Unsupported file type. Please upload a .docx or .pdf file."}
+            return {"error": "Unsupported file type. Please upload a .docx or .pdf file.", "statusCode": 415}
+
+        if error:
+            return error
 
         if not raw_text.strip():
-            return {"error": "Could not extract any text from the document."}
+            return {"error": "Could not extract any text from the document.", "statusCode": 422}
 
         print("--- Successfully extracted raw text from resume. ---")
-        
+
         # --- This is the new, live AI call ---
         # Replace the old placeholder data with a call to the AI utility
         print("--- Sending extracted text to AI for structuring... ---")
         structured_data = structure_text_with_ai(raw_text) # Uses the imported function
         print("--- AI processing complete. Returning structured data. ---")
-        
+
         return {"parsedData": structured_data}
 
+    except (PdfReadError, zipfile.BadZipFile) as e:
+        print(f"Rejected malformed upload {filename}: {e}")
+        return {"error": "The file is damaged or is not a valid .docx or .pdf document.", "statusCode": 400}
     except Exception as e:
         print(f"Error in parse_resume_file: {e}")
-        return {"error": f"An error occurred while parsing the file: {e}"}
\ No newline at end of file
+        return {"error": f"An error occurred while parsing the file: {e}"}
@@ -0,0 +1,378 @@
+# backend/load_test.py
+"""
+Load test and capacity model for the resume pipeline.
+
+Starts the Flask app in a subprocess against a stand-in Ollama server (see
+fake_ollama_server.py), then replays a weighted traffic mix at increasing
+concurrency levels:
+
+    parse    - ApplyJob-style /api/parse-resume uploads (PDF and DOCX)
+    enhance  - builder AI calls (/api/generate-elevator-pitch)
+    pdf      - /api/generate-pdf exports
+    docx     - /api/generate-docx exports
+
+For every stage it reports throughput, tail latencies per request type, and the
+app process's CPU, peak RSS and open connections, then picks the saturation point.
+The summary is written as JSON so it can be compared across releases.
+
+The tool needs psutil on top of the app's dependencies:
+
+    pip install -r backend/requirements-dev.txt
+
+Run from the repository root:
+
+    python -m backend.load_test --release v1.4.0 --output capacity.json
+"""
+import argparse
+import copy
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import psutil
+import requests
+
+from .fake_ollama_server import FakeOllamaModel, start_fake_ollama_server
+
+SAMPLE_RESUME = {
+    "personal": {"name": "Jordan Lee", "email": "jordan.lee@example.com", "phone": "555-0100", "location": "Austin, TX", "legalStatus": "Prefer not to say"},
+    "summary": "Backend engineer with six years of experience building data-heavy web services.",
+    "experience": [
+        {"id": "exp1", "jobTitle": "Software Engineer", "company": "Acme Corp", "dates": "2019 - Present",
+         "description": "Built the resume ingestion service.\nCut parse latency by 40%.\nMentored four engineers."},
+        {"id": "exp2", "jobTitle": "Junior Developer", "company": "Initech", "dates": "2017 - 2019",
+         "description": "Maintained internal reporting tools.\nAutomated weekly data exports."}
+    ],
+    "education": [
+        {"id": "edu1", "degree": "B.S. Computer Science", "institution": "State University", "graduationYear": "2017", "gpa": "3.7", "achievements": "Dean's list"}
+    ],
+    "skills": [{"id": "skill1", "category": "Languages", "skills_list": "Python, SQL, TypeScript"}],
+    "projects": [],
+    "publications": [],
+    "certifications": [],
+    "styleOptions": {"fontFamily": "Calibri, sans-serif", "fontSize": 11, "accentColor": "#34495e"}
+}
+
+DEFAULT_MIX = "parse=50,enhance=20,pdf=20,docx=10"
+# A stage is saturated once adding concurrency buys less than this much extra throughput
+MIN_THROUGHPUT_GAIN = 0.10
+MAX_ERROR_RATE = 0.01
+# Start of the text both LLM backends return from generate_elevator_pitch when the model fails
+PITCH_FALLBACK_PREFIX = "Could not generate elevator pitch."
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None if the list is empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return round(ordered[index], 1)
+
+
+def parse_mix(mix_spec):
+    """Parses 'parse=50,enhance=20,...' into a {kind: weight} dict."""
+    mix = {}
+    for part in mix_spec.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in ("parse", "enhance", "pdf", "docx"):
+            raise ValueError(f"Unknown request type in mix: '{kind}'")
+        mix[kind] = float(weight)
+    return mix
+
+
+def start_app(base_port, llm_url):
+    """
+    Starts the Flask app in its own process so its resource use can be measured separately.
+
+    Returns once the model warm-up has finished, so the first stage does not queue behind it.
+    """
+    env = dict(os.environ,
+               LLM_PROVIDER="ollama",
+               OLLAMA_HOST=llm_url,
+               OLLAMA_KEEP_WARM_INTERVAL="0",
+               FLASK_DEBUG="0",
+               PORT=str(base_port))
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # The app's own entry point is what starts the model warm-up
+    process = subprocess.Popen(
+        [sys.executable, "-m", "backend.app"],
+        cwd=repo_root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+    status_url = f"http://127.0.0.1:{base_port}/api/ollama-status"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("The Flask app exited during startup.")
+        try:
+            if requests.get(status_url, timeout=1).json().get("startup") is not None:
+                return process
+        except (requests.exceptions.RequestException, ValueError):
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("The Flask app did not finish warming up the model within 60 seconds.")
+
+
+def build_fixtures(base_url):
+    """Produces the PDF and DOCX resumes to upload, using the app's own export endpoints."""
+    fixtures = {}
+    for kind in ("pdf", "docx"):
+        response = requests.post(f"{base_url}/api/generate-{kind}", json=copy.deepcopy(SAMPLE_RESUME), timeout=120)
+        response.raise_for_status()
+        fixtures[kind] = response.content
+    return fixtures
+
+
+def _is_success(kind, response):
+    """
+    A 200 only counts as a success when the AI actually answered. Empty parsedData and the
+    elevator pitch fallback text both mean the LLM failed behind a 200 response.
+    """
+    if response.status_code != 200:
+        return False
+    if kind == "parse":
+        return bool(response.json().get("parsedData"))
+    if kind == "enhance":
+        return not response.json().get("elevatorPitch", "").startswith(PITCH_FALLBACK_PREFIX)
+    return True
+
+
+def send_request(session, base_url, kind, fixtures, rng):
+    """Sends one request of the given type and returns whether it succeeded."""
+    if kind == "parse":
+        file_type = rng.choice(("pdf", "docx"))
+        files = {"file": (f"resume.{file_type}", fixtures[file_type])}
+        response = session.post(f"{base_url}/api/parse-resume", files=files, timeout=600)
+    elif kind == "enhance":
+        response = session.post(f"{base_url}/api/generate-elevator-pitch", json=SAMPLE_RESUME, timeout=600)
+    else:
+        # The PDF export cleans the data in place, so every request gets its own copy
+        response = session.post(f"{base_url}/api/generate-{kind}", json=copy.deepcopy(SAMPLE_RESUME), timeout=600)
+    return _is_success(kind, response)
+
+
+class ResourceSampler:
+    """Samples CPU, RSS and open connections of the app process on a background thread."""
+
+    def __init__(self, pid, interval=0.5):
+        self.process = psutil.Process(pid)
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _connection_count(self):
+        # psutil >= 6 renamed connections() to net_connections()
+        get_connections = getattr(self.process, "net_connections", None) or self.process.connections
+        return len(get_connections(kind="tcp"))
+
+    def _run(self):
+        self.process.cpu_percent(None)
+        while not self._stop.wait(self.interval):
+            self.samples.append({
+                "cpu": self.process.cpu_percent(None),
+                "rss": self.process.memory_info().rss,
+                "connections": self._connection_count(),
+            })
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        if not self.samples:
+            return {"cpuAvgPercent": None, "cpuMaxPercent": None, "rssPeakMb": None, "connectionsMax": None}
+        cpu = [s["cpu"] for s in self.samples]
+        return {
+            "cpuAvgPercent": round(sum(cpu) / len(cpu), 1),
+            "cpuMaxPercent": round(max(cpu), 1),
+            "rssPeakMb": round(max(s["rss"] for s in self.samples) / (1024 * 1024), 1),
+            "connectionsMax": max(s["connections"] for s in self.samples),
+        }
+
+
+def run_stage(base_url, app_pid, llm_model, concurrency, duration, mix, fixtures, seed):
+    """Runs `concurrency` closed-loop clients for `duration` seconds and summarises the results."""
+    results = []
+    results_lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+    kinds = list(mix)
+    weights = [mix[k] for k in kinds]
+
+    def client(client_id):
+        rng = random.Random(seed * 1000 + client_id)
+        with requests.Session() as session:
+            while time.monotonic() < stop_at:
+                kind = rng.choices(kinds, weights)[0]
+                start = time.monotonic()
+                try:
+                    ok = send_request(session, base_url, kind, fixtures, rng)
+                except (requests.exceptions.RequestException, ValueError):
+                    ok = False
+                elapsed_ms = (time.monotonic() - start) * 1000
+                with results_lock:
+                    results.append((kind, ok, elapsed_ms))
+
+    llm_model.reset_stats()
+    sampler = ResourceSampler(app_pid)
+    sampler.start()
+    started = time.monotonic()
+    clients = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    wall_time = time.monotonic() - started
+    resources = sampler.stop()
+
+    errors = [r for r in results if not r[1]]
+    per_kind = {}
+    for kind in kinds:
+        latencies = [r[2] for r in results if r[0] == kind and r[1]]
+        per_kind[kind] = {
+            "requests": sum(1 for r in results if r[0] == kind),
+            "errors": sum(1 for r in errors if r[0] == kind),
+            "p50Ms": _percentile(latencies, 50),
+            "p95Ms": _percentile(latencies, 95),
+            "p99Ms": _percentile(latencies, 99),
+        }
+
+    all_latencies = [r[2] for r in results if r[1]]
+    return {
+        "concurrency": concurrency,
+        "requests": len(results),
+        "throughputRps": round((len(results) - len(errors)) / wall_time, 2),
+        "errorRate": round(len(errors) / len(results), 4) if results else 0.0,
+        "p50Ms": _percentile(all_latencies, 50),
+        "p95Ms": _percentile(all_latencies, 95),
+        "p99Ms": _percentile(all_latencies, 99),
+        "byType": per_kind,
+        "resources": resources,
+        "llmMaxQueueDepth": llm_model.max_queue_depth,
+    }
+
+
+def find_saturation(stages):
+    """
+    Returns the first stage where extra concurrency stopped paying off: throughput grew by
+    less than MIN_THROUGHPUT_GAIN over the previous stage, or the error rate exceeded MAX_ERROR_RATE.
+    """
+    previous = None
+    for stage in stages:
+        if stage["errorRate"] > MAX_ERROR_RATE:
+            return stage, previous, "error rate"
+        if previous and stage["throughputRps"] < previous["throughputRps"] * (1 + MIN_THROUGHPUT_GAIN):
+            return stage, previous, "throughput plateau"
+        previous = stage
+    return None, previous, None
+
+
+def _cell(value):
+    return "-" if value is None else value
+
+
+def print_summary(summary):
+    print(f"\nCapacity summary ({summary['release']})")
+    print(f"{'conc':>5} {'rps':>8} {'err%':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'cpu%':>6} {'rss MB':>8} {'conns':>6} {'llm q':>6}")
+    for stage in summary["stages"]:
+        res = stage["resources"]
+        print(f"{stage['concurrency']:>5} {stage['throughputRps']:>8} {stage['errorRate'] * 100:>6.1f} "
+              f"{_cell(stage['p50Ms']):>9} {_cell(stage['p95Ms']):>9} {_cell(stage['p99Ms']):>9} "
+              f"{_cell(res['cpuAvgPercent']):>6} {_cell(res['rssPeakMb']):>8} {_cell(res['connectionsMax']):>6} {stage['llmMaxQueueDepth']:>6}")
+
+    saturation = summary["saturation"]
+    if saturation["saturatedAt"] is None:
+        print(f"\nNo saturation reached; capacity is at least {saturation['maxSustainableConcurrency']} concurrent clients.")
+    else:
+        print(f"\nSaturated at {saturation['saturatedAt']} concurrent clients ({saturation['reason']}); "
+              f"max sustainable concurrency: {saturation['maxSustainableConcurrency']} "
+              f"at {saturation['maxSustainableRps']} req/s.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the resume pipeline and report a capacity summary.")
+    parser.add_argument("--release", default="dev", help="Label stored in the summary (e.g. a version or git tag)")
+    parser.add_argument("--ramp", default="1,2,4,8,16,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--stage-seconds", type=float, default=30.0)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted traffic mix of parse, enhance, pdf and docx requests")
+    parser.add_argument("--llm-parallel", type=int, default=1, help="Parallel slots of the stand-in LLM (like OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--llm-load-ms", type=float, default=2000.0)
+    parser.add_argument("--llm-prompt-token-ms", type=float, default=0.5)
+    parser.add_argument("--llm-output-token-ms", type=float, default=25.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON capacity summary to this file")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    ramp = [int(level) for level in args.ramp.split(",")]
+
+    llm_model = FakeOllamaModel(parallel=args.llm_parallel, load_ms=args.llm_load_ms,
+                                prompt_token_ms=args.llm_prompt_token_ms,
+                                output_token_ms=args.llm_output_token_ms)
+    llm_server = start_fake_ollama_server(llm_model)
+    llm_url = f"http://127.0.0.1:{llm_server.server_address[1]}"
+
+    app_port = _free_port()
+    base_url = f"http://127.0.0.1:{app_port}"
+    app_process = start_app(app_port, llm_url)
+    try:
+        fixtures = build_fixtures(base_url)
+        stages = []
+        for level in ramp:
+            print(f"Running {level} concurrent clients for {args.stage_seconds:.0f}s...")
+            stages.append(run_stage(base_url, app_process.pid, llm_model, level, args.stage_seconds, mix, fixtures, args.seed))
+
+        saturated, sustainable, reason = find_saturation(stages)
+        summary = {
+            "release": args.release,
+            "generatedAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "config": {
+                "mix": mix,
+                "stageSeconds": args.stage_seconds,
+                "llm": {
+                    "parallel": args.llm_parallel,
+                    "loadMs": args.llm_load_ms,
+                    "promptTokenMs": args.llm_prompt_token_ms,
+                    "outputTokenMs": args.llm_output_token_ms,
+                },
+            },
+            "stages": stages,
+            "saturation": {
+                "saturatedAt": saturated["concurrency"] if saturated else None,
+                "reason": reason,
+                "maxSustainableConcurrency": sustainable["concurrency"] if sustainable else None,
+                "maxSustainableRps": sustainable["throughputRps"] if sustainable else None,
+            },
+            "ollamaStatus": requests.get(f"{base_url}/api/ollama-status", timeout=10).json(),
+        }
+    finally:
+        app_process.terminate()
+        app_process.wait(timeout=30)
+        llm_server.shutdown()
+
+    print_summary(summary)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"Capacity summary written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,176 @@
 # backend/ollama_utils.py
+import os
 import requests
 import json
 import re
+import threading
+import time
 
-# This is the confirmed working endpoint from your test
-OLLAMA_API_URL = "http://localhost:11434/api/generate" 
-MODEL_NAME = "llama3:latest" # Using :latest as shown in your ollama list output
+# Which backend serves the AI features: "gemini" (default) or "ollama" for the local model
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini").lower()
+
+# Base URL of the local Ollama server (override with OLLAMA_HOST, e.g. when pointing at a stand-in server)
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434").rstrip("/")
+OLLAMA_CHAT_URL = f"{OLLAMA_HOST}/api/chat"
+OLLAMA_GENERATE_URL = f"{OLLAMA_HOST}/api/generate"
+MODEL_NAME = os.getenv("OLLAMA_MODEL", "llama3:latest") # Using :latest as shown in your ollama list output
+
+# How long Ollama keeps the model in memory after a request: a duration string such as "30m",
+# a number of seconds, or a negative number to never unload
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+# Seconds of idle time after which a keep-warm ping is sent (0 disables the pings).
+# It must be shorter than OLLAMA_KEEP_ALIVE, otherwise the model unloads between pings;
+# start_model_lifecycle() clamps it to half the keep-alive duration if it is not.
+OLLAMA_KEEP_WARM_INTERVAL = int(os.getenv("OLLAMA_KEEP_WARM_INTERVAL", "600"))
+
+# Latency figures reported by Ollama, split into the first (cold) request and the running steady state
+_stats_lock = threading.Lock()
+_stats = {
+    "startup": None,
+    "steady_state": {"requests": 0, "avg_ttft_ms": None, "last_ttft_ms": None, "last_prompt_eval_count": None},
+}
+_last_used = 0.0
+_keep_warm_thread = None
+
+
+# --- Static prompt prefixes ---
+# These system messages are sent byte-for-byte identical on every call, so Ollama can reuse
+# the already-evaluated prefix from its prompt cache and only evaluate the user message.
+RESUME_SCHEMA = {
+    "personal": {"name": "string", "email": "string", "phone": "string", "location": "string"},
+    "summary": "string",
+    "experience": [{"jobTitle": "string", "company": "string", "dates": "string", "description": "string"}],
+    "education": [{"degree": "string", "institution": "string", "graduationYear": "string", "gpa": "string", "achievements": "string"}],
+    "skills": [{"category": "string", "skills_list": "string"}],
+    "certifications": [{"name": "string", "issuer": "string", "date": "string"}],
+    "publications": [{"title": "string", "authors": "string", "journal": "string", "date": "string", "link": "string"}]
+}
+
+PARSE_SYSTEM_PROMPT = f"""You are an expert resume parser. Extract the information from the resume text given by the user and provide the output in a valid JSON format that adheres to the schema provided below.
+Ensure all fields are filled, even if with an empty string or empty list if no information is found.
+
+Schema:
+{json.dumps(RESUME_SCHEMA, indent=2)}"""
+
+SUMMARY_SYSTEM_PROMPT = """Rewrite and enhance the resume summary given by the user. Make it more professional, impactful, and concise.
+Generate exactly 3 distinct versions.
+Your final output must be a valid JSON object with a single key "versions" that contains an array of the 3 strings.
+
+Example format: {"versions": ["First version...", "Second version...", "Third version..."]}"""
+
+SECTION_SYSTEM_PROMPT = """You are a professional resume advisor.
+Rewrite the resume section given by the user to be more professional and impactful.
+Focus on clarity, conciseness, and the use of action verbs. Use bullet points where appropriate.
+Reply with the improved text only."""
+
+PITCH_SYSTEM_PROMPT = """Based on the resume data given by the user, generate a compelling and concise 30-second elevator pitch.
+The pitch should be professional, engaging, and highlight the candidate's key strengths and career goals.
+Reply with the elevator pitch only."""
+
+
+def _keep_alive_value(keep_alive: str):
+    """Ollama parses strings as Go durations, so bare numbers (seconds) are sent as numbers."""
+    try:
+        return int(keep_alive)
+    except ValueError:
+        return keep_alive
+
+
+def _keep_alive_seconds(keep_alive: str):
+    """
+    Converts an Ollama keep_alive value to seconds.
+
+    Returns:
+        The duration in seconds, None if the model is never unloaded, or -1.0 if the value cannot be parsed.
+    """
+    value = _keep_alive_value(keep_alive)
+    if isinstance(value, int):
+        return None if value < 0 else float(value)
+    if value.startswith("-"):
+        return None
+
+    parts = re.findall(r'(\d+(?:\.\d+)?)(ms|h|m|s)', value)
+    if not parts or "".join(number + unit for number, unit in parts) != value:
+        return -1.0
+    unit_seconds = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * unit_seconds[unit] for number, unit in parts)
+
+
+def _build_messages(system_prompt: str, user_content: str) -> list[dict]:
+    """Builds a chat message list with the static instructions first and the variable input last."""
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_content},
+    ]
+
+
+def _record_timings(response_json: dict):
+    """Records the time-to-first-token reported by Ollama (model load + prompt evaluation)."""
+    global _last_used
+    load_ms = response_json.get('load_duration', 0) / 1e6
+    prompt_eval_ms = response_json.get('prompt_eval_duration', 0) / 1e6
+    ttft_ms = round(load_ms + prompt_eval_ms, 1)
+    prompt_eval_count = response_json.get('prompt_eval_count')
+
+    with _stats_lock:
+        _last_used = time.monotonic()
+        if _stats["startup"] is None:
+            _stats["startup"] = {"ttft_ms": ttft_ms, "load_ms": round(load_ms, 1)}
+            print(f"🔥 Ollama startup TTFT: {ttft_ms} ms (model load {load_ms:.1f} ms)")
+            return
+
+        steady = _stats["steady_state"]
+        steady["requests"] += 1
+        previous_avg = steady["avg_ttft_ms"] or 0.0
+        steady["avg_ttft_ms"] = round(previous_avg + (ttft_ms - previous_avg) / steady["requests"], 1)
+        steady["last_ttft_ms"] = ttft_ms
+        steady["last_prompt_eval_count"] = prompt_eval_count
+
+    print(f"⏱️ Ollama TTFT: {ttft_ms} ms ({prompt_eval_count} prompt tokens evaluated)")
+
+
+def get_ollama_stats() -> dict:
+    """Returns a snapshot of the startup and steady-state time-to-first-token figures."""
+    with _stats_lock:
+        return {
+            "model": MODEL_NAME,
+            "keepAlive": OLLAMA_KEEP_ALIVE,
+            "startup": dict(_stats["startup"]) if _stats["startup"] else None,
+            "steadyState": dict(_stats["steady_state"]),
+        }
+
+
+def _query_ollama(messages, is_json=False, options=None):
+    """Generic function to query the Ollama API using the chat endpoint."""
 
-def _query_ollama(prompt, is_json=False):
-    """Generic function to query the Ollama API using the generate endpoint."""
-    
     payload = {
         "model": MODEL_NAME,
-        "prompt": prompt,
-        "stream": False
+        "messages": messages,
+        "stream": False,
+        "keep_alive": _keep_alive_value(OLLAMA_KEEP_ALIVE)
     }
     if is_json:
         payload["format"] = "json"
-        
+    if options:
+        payload["options"] = options
+
+    response_text = ""
     try:
         # Increased timeout to 300 seconds (5 minutes) for complex tasks
-        response = requests.post(OLLAMA_API_URL, json=payload, timeout=300)
+        response = requests.post(OLLAMA_CHAT_URL, json=payload, timeout=300)
         response.raise_for_status()
-        
-        response_text = response.json().get('response', '')
+
+        response_json = response.json()
+        _record_timings(response_json)
+        response_text = response_json.get('message', {}).get('content', '')
 
         if is_json:
             # The model might wrap the JSON in markdown backticks, so we clean it.
             cleaned_json = re.sub(r'^```json\s*|\s*```$', '', response_text.strip(), flags=re.MULTILINE)
             return json.loads(cleaned_json)
-        
+
         return response_text.strip()
-        
+
     except requests.exceptions.RequestException as e:
         print(f"🚨 Error connecting to Ollama API: {e}")
         return None
@@ -40,93 +179,126 @@ def _query_ollama(prompt, is_json=False):
         print(f"Raw response: {response_text}")
         return None
 
+
+# --- Model lifecycle ---
+def warm_up_model() -> bool:
+    """
+    Loads the model into memory and primes the prompt cache with the resume parsing prefix,
+    so the first real /parse-resume request does not pay the model load time.
+
+    Only a single token is generated, so a request arriving during startup does not queue
+    behind a full warm-up completion.
+    """
+    start = time.monotonic()
+    result = _query_ollama(_build_messages(PARSE_SYSTEM_PROMPT, "{}"), options={"num_predict": 1})
+    if result is None:
+        print("🚨 Ollama warm-up failed; the first request will load the model.")
+        return False
+    print(f"✅ Ollama model '{MODEL_NAME}' warmed up in {time.monotonic() - start:.1f}s.")
+    return True
+
+
+def _ping_model():
+    """Refreshes the keep-alive timer without generating any tokens."""
+    global _last_used
+    payload = {"model": MODEL_NAME, "keep_alive": _keep_alive_value(OLLAMA_KEEP_ALIVE)}
+    try:
+        response = requests.post(OLLAMA_GENERATE_URL, json=payload, timeout=300)
+        response.raise_for_status()
+        with _stats_lock:
+            _last_used = time.monotonic()
+    except requests.exceptions.RequestException as e:
+        print(f"🚨 Ollama keep-warm ping failed: {e}")
+
+
+def _keep_warm_interval() -> float:
+    """Returns the ping interval, clamped below the keep-alive duration (0 means no pings)."""
+    keep_alive = _keep_alive_seconds(OLLAMA_KEEP_ALIVE)
+    if OLLAMA_KEEP_WARM_INTERVAL <= 0 or keep_alive is None:
+        return float(max(OLLAMA_KEEP_WARM_INTERVAL, 0))
+    if keep_alive < 0:
+        print(f"🚨 Could not parse OLLAMA_KEEP_ALIVE='{OLLAMA_KEEP_ALIVE}'; keep-warm interval left at {OLLAMA_KEEP_WARM_INTERVAL}s.")
+        return float(OLLAMA_KEEP_WARM_INTERVAL)
+    if keep_alive == 0:
+        print("🚨 OLLAMA_KEEP_ALIVE=0 unloads the model after every request; keep-warm pings are disabled.")
+        return 0.0
+    if OLLAMA_KEEP_WARM_INTERVAL >= keep_alive:
+        interval = keep_alive / 2
+        print(f"🚨 OLLAMA_KEEP_WARM_INTERVAL ({OLLAMA_KEEP_WARM_INTERVAL}s) is not shorter than "
+              f"OLLAMA_KEEP_ALIVE ({OLLAMA_KEEP_ALIVE}); pinging every {interval:g}s instead.")
+        return interval
+    return float(OLLAMA_KEEP_WARM_INTERVAL)
+
+
+def _keep_warm_loop(interval: float):
+    while True:
+        with _stats_lock:
+            idle_for = time.monotonic() - _last_used
+        # Real traffic already refreshes keep_alive, so only ping after an idle interval
+        if idle_for >= interval:
+            _ping_model()
+            time.sleep(interval)
+        else:
+            # Wake up exactly when the idle interval runs out, so pings are never more than one interval apart
+            time.sleep(interval - idle_for)
+
+
+def start_model_lifecycle():
+    """Warms up the model and starts the keep-warm pings in a background thread."""
+    global _keep_warm_thread
+    if _keep_warm_thread is not None:
+        return
+
+    interval = _keep_warm_interval()
+
+    def _run():
+        warm_up_model()
+        if interval > 0:
+            _keep_warm_loop(interval)
+
+    _keep_warm_thread = threading.Thread(target=_run, name="ollama-keep-warm", daemon=True)
+    _keep_warm_thread.start()
+
+
 def enhance_with_ollama(section_name: str, text_to_enhance: str) -> list[str]:
     """Sends text to Ollama for enhancement and returns multiple versions."""
     if not text_to_enhance.strip():
         return [text_to_enhance]
-    
+
     is_summary = 'summary' in section_name.lower()
 
     if is_summary:
-        prompt = f"""
-        Rewrite and enhance the following resume summary. Make it more professional, impactful, and concise.
-        Generate exactly 3 distinct versions.
-        Your final output must be a valid JSON object with a single key "versions" that contains an array of the 3 strings.
-        
-        Example format: {{"versions": ["First version...", "Second version...", "Third version..."]}}
-        
-        Input Text:
-        ---
-        {text_to_enhance}
-        ---
-        """
-        response_data = _query_ollama(prompt, is_json=True)
+        messages = _build_messages(SUMMARY_SYSTEM_PROMPT, text_to_enhance)
+        response_data = _query_ollama(messages, is_json=True)
         if response_data and isinstance(response_data, dict):
             versions = response_data.get("versions", [])
             if isinstance(versions, list) and all(isinstance(v, str) for v in versions):
                 return versions
         return [text_to_enhance] # Fallback
     else:
-        prompt = f"""
-        You are a professional resume advisor.
-        Please rewrite the following resume section (Section: {section_name}) to be more professional and impactful.
-        Focus on clarity, conciseness, and the use of action verbs. Use bullet points where appropriate.
-        
-        Input Text:
-        ---
-        {text_to_enhance}
-        ---
-        Improved Text:
-        """
-        response_text = _query_ollama(prompt)
+        # The section name goes in the user message so the system prefix stays identical across sections
+        messages = _build_messages(SECTION_SYSTEM_PROMPT, f"Section: {section_name}\n\n{text_to_enhance}")
+        response_text = _query_ollama(messages)
         return [response_text] if response_text else [text_to_enhance]
 
 
 def generate_resume_fields_from_raw_text(resume_text: str) -> dict:
-    """Extracts structured resume data from raw text using a local Ollama model."""
+    """
+    Extracts structured resume data from raw text using a local Ollama model.
+
+    Raises an exception when Ollama is unreachable or returns unusable output, like
+    gemini_utils.structure_text_with_ai, so the upload fails instead of returning empty data.
+    """
     if not resume_text.strip():
         return {}
-        
-    schema = {
-        "personal": {"name": "string", "email": "string", "phone": "string", "location": "string"},
-        "summary": "string",
-        "experience": [{"jobTitle": "string", "company": "string", "dates": "string", "description": "string"}],
-        "education": [{"degree": "string", "institution": "string", "graduationYear": "string", "gpa": "string", "achievements": "string"}],
-        "skills": [{"category": "string", "skills_list": "string"}],
-        "certifications": [{"name": "string", "issuer": "string", "date": "string"}],
-        "publications": [{"title": "string", "authors": "string", "journal": "string", "date": "string", "link": "string"}]
-    }
-    
-    prompt = f"""
-    You are an expert resume parser. Extract the information from the following resume text and provide the output in a valid JSON format that adheres to the schema provided below.
-    Ensure all fields are filled, even if with an empty string or empty list if no information is found.
-    
-    Schema:
-    {json.dumps(schema, indent=2)}
-    
-    Resume Text:
-    ---
-    {resume_text}
-    ---
-    
-    JSON Output:
-    """
-    
-    response_data = _query_ollama(prompt, is_json=True)
-    return response_data if isinstance(response_data, dict) else {}
+
+    response_data = _query_ollama(_build_messages(PARSE_SYSTEM_PROMPT, resume_text), is_json=True)
+    if not isinstance(response_data, dict) or not response_data:
+        raise Exception("Failed to parse resume using AI.")
+    return response_data
 
 def generate_elevator_pitch(resume_data: dict) -> str:
     """Generates a concise elevator pitch from resume data using Ollama."""
     resume_summary_text = json.dumps(resume_data, indent=2)
-    prompt = f"""
-    Based on the following resume data, generate a compelling and concise 30-second elevator pitch.
-    The pitch should be professional, engaging, and highlight the candidate's key strengths and career goals.
-    
-    Resume Details (JSON):
-    ---
-    {resume_summary_text}
-    ---
-    
-    Elevator Pitch:
-    """
-    return _query_ollama(prompt) or "Could not generate elevator pitch."
\ No newline at end of file
+    messages = _build_messages(PITCH_SYSTEM_PROMPT, resume_summary_text)
+    return _query_ollama(messages) or "Could not generate elevator pitch."
@@ -1,15 +1,26 @@
 # backend/routes.py
 from flask import request, jsonify, send_file, Blueprint
+from werkzeug.exceptions import RequestEntityTooLarge
 import io
 
 # Make sure these functions are correctly imported from your other files
 from .document_generator import generate_docx_from_data, generate_pdf_from_data
 from .file_parser import parse_resume_file
-from .gemini_utils import generate_elevator_pitch # Changed to import from gemini_utils
+from .ollama_utils import LLM_PROVIDER, get_ollama_stats
+
+# LLM_PROVIDER=ollama runs the AI features on the local Ollama model instead of Gemini
+if LLM_PROVIDER == "ollama":
+    from .ollama_utils import generate_elevator_pitch
+else:
+    from .gemini_utils import generate_elevator_pitch # Changed to import from gemini_utils
 
 # Create a Blueprint for API routes
 api_bp = Blueprint('api', __name__)
 
+@api_bp.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    return jsonify({"error": "The uploaded file is too large."}), 413
+
 # --- Resume Parsing Endpoint ---
 @api_bp.route('/parse-resume', methods=['POST'])
 def parse_resume_route():
@@ -25,7 +36,8 @@ def parse_resume_route():
         try:
             result = parse_resume_file(file)
             if "error" in result:
-                return jsonify(result), 500
+                status_code = result.pop("statusCode", 500)
+                return jsonify(result), status_code
             
             return jsonify(result), 200
 
@@ -97,4 +109,9 @@ def generate_elevator_pitch_route():
         return jsonify({"elevatorPitch": pitch}), 200
     except Exception as e:
         print(f"Error generating elevator pitch: {e}")
-        return jsonify({"error": "An internal error occurred while generating the elevator pitch."}), 500
\ No newline at end of file
+        return jsonify({"error": "An internal error occurred while generating the elevator pitch."}), 500
+
+# --- Local model status: startup and steady-state time-to-first-token ---
+@api_bp.route('/ollama-status', methods=['GET'])
+def ollama_status_route():
+    return jsonify(get_ollama_stats()), 200